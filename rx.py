@@ -4,16 +4,19 @@
 # License: GPL-3.0-or-later
 
 import socket
+import selectors
 import os
 import sys
 import argparse
 import subprocess
+import time
 
 # Configuration
 HOST = "localhost"
 KISS_PORT = 8001
 DEFAULT_MAX_INFO = 100
 DEFAULT_RECEIVED_DIR = 'received'
+SSDV_INTERVAL = 2.0
 
 ####################################
 VERSION = '0.02'
@@ -38,6 +41,7 @@ if args.max < 16 or args.max > 2048:
 
 MAX_INFO = args.max
 RECEIVED_DIR  = args.dir
+_ZERO_CHUNK = b'\x00' * MAX_INFO
 
 # KISS constants
 FEND = 0xC0
@@ -45,22 +49,93 @@ FESC = 0xDB
 TFEND = 0xDC
 TFESC = 0xDD
 
+# AX.25 address bytes carry the ASCII character shifted left by one
+_SHIFT_TBL = bytes((i >> 1) & 0x7F for i in range(256))
+
 def unescape_kiss(data):
-    i = 0
-    unescaped = bytearray()
-    while i < len(data):
-        if data[i] == FESC:
-            i += 1
-            if i >= len(data):
+    # Split on FESC so the unescaped runs are copied in C; each part after
+    # the first starts with the byte that followed an FESC.
+    parts = data.split(b'\xDB')
+    unescaped = [parts[0]]
+    consumed = False
+    for part in parts[1:]:
+        if consumed:
+            # This FESC was the (invalid) escaped byte of the previous one
+            unescaped.append(part)
+            consumed = False
+            continue
+        if not part:
+            # FESC FESC, or FESC at the end: both bytes are dropped
+            consumed = True
+            continue
+        if part[0] == TFESC:
+            unescaped.append(b'\xDB')
+        elif part[0] == TFEND:
+            unescaped.append(b'\xC0')
+        unescaped.append(part[1:])
+    return b''.join(unescaped)
+
+def parse_kiss_frame(frame_data):
+    """Decode one escaped KISS data frame into (file_id, src_call, frame_num, chunk).
+
+    Returns None for frames that are not file2afsk UI frames. The chunk is
+    returned as received; padding to MAX_INFO is left to the caller.
+    """
+    raw_frame = unescape_kiss(frame_data)
+
+    # 14 address bytes + control/PID + 2-byte frame number
+    if len(raw_frame) < 18 or raw_frame[14:16] != b'\x03\xf0':
+        return None
+
+    file_id = raw_frame[0:6].translate(_SHIFT_TBL).decode('ascii').strip()
+    src_call = raw_frame[7:13].translate(_SHIFT_TBL).decode('ascii').strip()
+    frame_num = int.from_bytes(raw_frame[16:18], 'big')
+    return file_id, src_call, frame_num, raw_frame[18:]
+
+class BufferedReader:
+    """Read from the KISS socket in blocks instead of one byte per recv()."""
+
+    def __init__(self, sock, size=8192):
+        self.sock = sock
+        self.buf = bytearray(size)
+        self.view = memoryview(self.buf)
+
+    def fill(self):
+        # Returns the number of fresh bytes at the start of self.buf, 0 on EOF
+        return self.sock.recv_into(self.view)
+
+def split_kiss_frames(buf, length, state):
+    """Consume buf[:length] and return the list of completed (command_byte, frame_data).
+
+    state carries in_frame/command_byte/frame_data across calls, since a
+    frame may be split over several reads.
+    """
+    frames = []
+    pos = 0
+    while pos < length:
+        if not state['in_frame']:
+            i = buf.find(FEND, pos, length)
+            if i < 0:
                 break
-            if data[i] == TFESC:
-                unescaped.append(FESC)
-            elif data[i] == TFEND:
-                unescaped.append(FEND)
+            state['in_frame'] = True
+            state['frame_data'].clear()
+            state['command_byte'] = None
+            pos = i + 1
         else:
-            unescaped.append(data[i])
-        i += 1
-    return bytes(unescaped)
+            i = buf.find(FEND, pos, length)
+            end = length if i < 0 else i
+            if pos < end:
+                if state['command_byte'] is None:
+                    state['command_byte'] = buf[pos]
+                    pos += 1
+                state['frame_data'] += buf[pos:end]
+            if i < 0:
+                break
+            if len(state['frame_data']) > 0 and state['command_byte'] is not None:
+                frames.append((state['command_byte'], bytes(state['frame_data'])))
+            state['in_frame'] = False
+            pos = i + 1
+    return frames
 
 def ssdv_decoding(input_filename,output_filename):
   try:
@@ -103,6 +178,9 @@ sys.stdout.flush()
 sock = None
 try:
     sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 20)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 1 << 20)
     sock.settimeout(10)
     sock.connect((HOST, KISS_PORT))
     print("SUCCESS ✓\n")
@@ -119,134 +197,131 @@ except Exception as e:
     sys.exit(1)
 
 active_transfers = {}
+frame_stats = {'short': 0, 'long': 0}
+
+def process_frame(command_byte, frame_data):
+    if command_byte != 0x00:
+        return
+
+    parsed = parse_kiss_frame(frame_data)
+    if parsed is None:
+        return
+    file_id, src_call, frame_num, chunk = parsed
+
+    original_len = len(chunk)
+    if original_len != MAX_INFO:
+        # Pad or truncate to MAX_INFO; report only the first and every 100th
+        frame_stats['short' if original_len < MAX_INFO else 'long'] += 1
+        if (frame_stats['short'] + frame_stats['long']) % 100 == 1:
+            print(f"   ⚠ Frame {frame_num:4d}: {original_len} bytes adjusted to {MAX_INFO} "
+                  f"({frame_stats['short']} short, {frame_stats['long']} oversized so far)")
+        chunk = (chunk + _ZERO_CHUNK)[:MAX_INFO]
+
+    transfer = active_transfers.get(file_id)
+    if transfer is None:
+        safe_src = src_call if src_call else "UNKNOWN"
+        safe_file_id = file_id if file_id else "XX"
+        filename = f"received_from_{safe_src}_{safe_file_id}.bin"
+        ssdvname = f"ssdv_from_{safe_src}_{safe_file_id}.jpg"
+        transfer = active_transfers[file_id] = {
+            'buf': bytearray(),
+            'present': bytearray(),
+            'highest': -1,
+            'src': src_call,
+            'filename': filename,
+            'ssdvname': ssdvname,
+            'fh': open(os.path.join(RECEIVED_DIR, filename), 'w+b'),
+            'last_ssdv_received': 0,
+            'last_ssdv_time': 0
+        }
+        print(f"\n=== New file transfer ===")
+        print(f"   FILE_ID : {file_id}")
+        print(f"   From    : {src_call}")
+        print(f"   Saving  : {filename}")
+
+    buf = transfer['buf']
+    present = transfer['present']
+    filename = transfer['filename']
+
+    if frame_num >= len(present):
+        missing = frame_num + 1 - len(present)
+        present.extend(bytes(missing))
+        buf.extend(bytes(missing * MAX_INFO))
+
+    if not present[frame_num]:
+        offset = frame_num * MAX_INFO
+        present[frame_num] = 1
+        buf[offset:offset + MAX_INFO] = chunk
+        if frame_num > transfer['highest']:
+            transfer['highest'] = frame_num
+        # Only the new chunk is written; frames not yet received read back as zeros
+        fh = transfer['fh']
+        fh.seek(offset)
+        fh.write(chunk)
+        fh.flush()
+        print(f"   ✓ Frame {frame_num:4d} stored")
+    else:
+        print(f"   Duplicate frame {frame_num} ignored")
+
+    total_frames = transfer['highest'] + 1
+    received = present.count(1)
+
+    #ssdv auto decode, at most once every SSDV_INTERVAL seconds and only when new frames arrived
+    now = time.monotonic()
+    if received != transfer['last_ssdv_received'] and now - transfer['last_ssdv_time'] >= SSDV_INTERVAL:
+        transfer['last_ssdv_received'] = received
+        transfer['last_ssdv_time'] = now
+        ssdv_process = ssdv_decoding(os.path.join(RECEIVED_DIR, filename),os.path.join(RECEIVED_DIR, transfer['ssdvname']))
+
+    size_kb = total_frames * MAX_INFO / 1024
+    print(f"   → {filename} | {received}/{total_frames} frames ({size_kb:.1f} KB)")
 
 print("Receiver ready — waiting for transmissions...")
 
 try:
-    in_frame = False
-    command_byte = None
-    frame_data = bytearray()
+    reader = BufferedReader(sock)
+    kiss_state = {'in_frame': False, 'command_byte': None, 'frame_data': bytearray()}
+    sel = selectors.DefaultSelector()
+    sel.register(sock, selectors.EVENT_READ)
 
     while True:
+        if not sel.select(timeout=1.0):
+            continue
         try:
-            byte = sock.recv(1)
-            if not byte:
+            n = reader.fill()
+            if not n:
                 print("\nWarning: Connection closed by Direwolf.")
                 break
-        except socket.timeout:
-            continue
         except BrokenPipeError:
             print("\nWarning: Connection lost.")
             break
 
-        b = byte[0]
-
-        if not in_frame:
-            if b == FEND:
-                in_frame = True
-                frame_data.clear()
-                command_byte = None
-        else:
-            if b == FEND:
-                if len(frame_data) > 0 and command_byte is not None:
-                    try:
-                        raw_frame = unescape_kiss(frame_data)
-
-                        if command_byte != 0x00:
-                            in_frame = False
-                            continue
-
-                        if len(raw_frame) < 18:
-                            in_frame = False
-                            continue
-
-                        dest_field = raw_frame[0:7]
-                        src_field = raw_frame[7:14]
-                        ctrl_pid = raw_frame[14:16]
-
-                        if ctrl_pid != b'\x03\xf0':
-                            in_frame = False
-                            continue
-
-                        file_id = ''.join(chr(c >> 1) for c in dest_field[:6]).strip()
-                        src_call = ''.join(chr(c >> 1) for c in src_field[:6]).strip()
-
-                        payload = raw_frame[16:]
-
-                        if len(payload) < 2:
-                            print(f"   ⚠ Corrupt: payload too short – skipping frame")
-                            in_frame = False
-                            continue
-
-                        frame_num = int.from_bytes(payload[0:2], 'big')
-                        chunk = payload[2:]
-
-                        original_len = len(chunk)
-
-                        if len(chunk) < MAX_INFO:
-                            chunk = chunk.ljust(MAX_INFO, b'\x00')
-                            print(f"   ⚠ Frame {frame_num:4d}: short ({original_len} → padded to {MAX_INFO} bytes)")
-                        elif len(chunk) > MAX_INFO:
-                            chunk = chunk[:MAX_INFO]
-                            print(f"   ⚠ Frame {frame_num:4d}: oversized ({original_len} → truncated to {MAX_INFO} bytes)")
-
-                        safe_src = src_call if src_call else "UNKNOWN"
-                        safe_file_id = file_id if file_id else "XX"
-                        filename = f"received_from_{safe_src}_{safe_file_id}.bin"
-                        ssdvname = f"ssdv_from_{safe_src}_{safe_file_id}.jpg"
-
-                        if file_id not in active_transfers:
-                            active_transfers[file_id] = {
-                                'chunks': {},
-                                'highest': -1,
-                                'src': src_call,
-                                'filename': filename,
-                                'ssdvname': ssdvname
-                            }
-                            print(f"\n=== New file transfer ===")
-                            print(f"   FILE_ID : {file_id}")
-                            print(f"   From    : {src_call}")
-                            print(f"   Saving  : {filename}")
-
-                        transfer = active_transfers[file_id]
-
-                        if frame_num not in transfer['chunks']:
-                            transfer['chunks'][frame_num] = chunk
-                            transfer['highest'] = max(transfer['highest'], frame_num)
-                            print(f"   ✓ Frame {frame_num:4d} stored")
-                        else:
-                            print(f"   Duplicate frame {frame_num} ignored")
-
-                        with open(os.path.join(RECEIVED_DIR, transfer['filename']), 'wb') as f:
-                            for i in range(transfer['highest'] + 1):
-                                f.write(transfer['chunks'].get(i, b'\x00' * MAX_INFO))
-
-                        #ssdv auto decode
-                        ssdv_process = ssdv_decoding(os.path.join(RECEIVED_DIR, transfer['filename']),os.path.join(RECEIVED_DIR, transfer['ssdvname']))
-
-                        total_frames = transfer['highest'] + 1
-                        received = len(transfer['chunks'])
-                        size_kb = os.path.getsize(os.path.join(RECEIVED_DIR, transfer['filename'])) / 1024
-                        print(f"   → {filename} | {received}/{total_frames} frames ({size_kb:.1f} KB)")
-
-                    except Exception as e:
-                        print(f"   ⚠ Malformed frame skipped (error: {e})")
-
-                in_frame = False
-            else:
-                if command_byte is None:
-                    command_byte = b
-                else:
-                    frame_data.append(b)
+        for command_byte, frame_data in split_kiss_frames(reader.buf, n, kiss_state):
+            try:
+                process_frame(command_byte, frame_data)
+            except Exception as e:
+                print(f"   ⚠ Malformed frame skipped (error: {e})")
 
 except KeyboardInterrupt:
     print("\n\nReceiver stopped by user.")
 
 finally:
     sock.close()
+    if frame_stats['short'] or frame_stats['long']:
+        print(f"\nFrames adjusted to {MAX_INFO} bytes: {frame_stats['short']} short, {frame_stats['long']} oversized")
     print("\n=== Final received files ===")
     for t in active_transfers.values():
+        # Emit the whole reassembled buffer in one write and make sure it hits the disk
+        fd = t['fh'].fileno()
+        view = memoryview(t['buf'])
+        written = 0
+        while written < len(view):
+            written += os.pwrite(fd, view[written:], written)
+        os.fsync(fd)
+        t['fh'].close()
         filename = t['filename']
+        if t['present'].count(1) != t['last_ssdv_received']:
+            ssdv_decoding(os.path.join(RECEIVED_DIR, filename),os.path.join(RECEIVED_DIR, t['ssdvname']))
         #ssdvname = t['ssdvname']
         if os.path.exists(os.path.join(RECEIVED_DIR, filename)):
             size_kb = os.path.getsize(os.path.join(RECEIVED_DIR, filename)) / 1024
@@ -8,6 +8,7 @@ import sys
 import time
 import subprocess
 import os
+import mmap
 import hashlib
 import string
 import argparse
@@ -54,11 +55,14 @@ MAX_INFO = args.max
 FRAME_DELAY = args.delay
 AUDIO_DIR = args.dir
 
+# Frames sent back-to-back (--delay 0) are coalesced into one send per batch
+FRAME_BATCH = 8 if FRAME_DELAY == 0 else 1
+
 ALPHANUM = string.ascii_uppercase + string.digits
 
 def generate_file_id_from_filename(filename):
-    hash_obj = hashlib.sha256(filename.encode('utf-8')).digest()
-    byte1, byte2 = hash_obj[0], hash_obj[1]
+    # Only two bytes are used, so ask for a two-byte digest
+    byte1, byte2 = hashlib.blake2s(filename.encode('utf-8'), digest_size=2).digest()
     return ALPHANUM[byte1 % 36] + ALPHANUM[byte2 % 36]
 
 def start_recording(output_filename):
@@ -74,13 +78,16 @@ TFEND = b'\xDC'
 TFESC = b'\xDD'
 
 def kiss_escape(data):
-    data = data.replace(FESC, FESC + TFESC)
-    data = data.replace(FEND, FESC + TFEND)
-    return data
+    # One FESC pass: the parts contain no FESC, so FEND can be escaped per part
+    parts = data.split(FESC)
+    return (FESC + TFESC).join([part.replace(FEND, FESC + TFEND) for part in parts])
+
+# AX.25 address bytes carry the ASCII character shifted left by one
+_SHL_TBL = bytes((i << 1) & 0xFF for i in range(256))
 
 def ax25_address(call, last=False):
     call_padded = call.ljust(6).upper()[:6] + " "
-    addr = bytes([ord(c) << 1 for c in call_padded[:6]])
+    addr = call_padded[:6].encode('ascii').translate(_SHL_TBL)
     ssid = (ord(call_padded[6]) << 1) | 0x60
     if last:
         ssid |= 1
@@ -117,6 +124,9 @@ sys.stdout.flush()
 sock = None
 try:
     sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 20)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 1 << 20)
     sock.settimeout(10)
     sock.connect((HOST, KISS_PORT))
     print("SUCCESS ✓")
@@ -133,9 +143,13 @@ except Exception as e:
     sys.exit(1)
 
 # === Proceed ===
-data = open(filename, 'rb').read()
+# Map the file instead of reading it into memory; mmap cannot map an empty file
+with open(filename, 'rb') as f:
+    data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if os.fstat(f.fileno()).st_size else b''
 src_addr = ax25_address(SRC_CALL)
 dest_addr = ax25_address(FILE_ID, last=True)
+header = dest_addr + src_addr + b'\x03\xf0'
+kiss_open = FEND + b'\x00'
 
 print("Starting WAV recording...")
 wav_process = start_recording(os.path.join(AUDIO_DIR, output_wav))
@@ -148,27 +162,40 @@ total_frames = (total_bytes + MAX_INFO - 1) // MAX_INFO
 
 print(f"Sending {total_bytes} bytes in ~{total_frames} frames...\n")
 
+pending = []
+# Frames are paced against absolute deadlines so build/send time is not added to FRAME_DELAY
+deadline = time.monotonic()
+
 while offset < total_bytes:
     chunk_size = min(MAX_INFO, total_bytes - offset)
     chunk = data[offset:offset + chunk_size]
     offset += chunk_size
     
     payload = frame_num.to_bytes(2, 'big') + chunk
-    frame = dest_addr + src_addr + b'\x03\xf0' + payload
-    kiss_frame = FEND + b'\x00' + kiss_escape(frame) + FEND
+    frame = header + payload
+    kiss_frame = kiss_open + kiss_escape(frame) + FEND
     
-    try:
-        sock.sendall(kiss_frame)
-    except BrokenPipeError:
-        print("\nError: Connection lost during transmission.")
-        sock.close()
-        stop_recording(wav_process)
-        sys.exit(1)
+    pending.append(kiss_frame)
+    if len(pending) >= FRAME_BATCH or offset >= total_bytes:
+        try:
+            sock.sendall(b''.join(pending))
+        except BrokenPipeError:
+            print("\nError: Connection lost during transmission.")
+            sock.close()
+            stop_recording(wav_process)
+            sys.exit(1)
+        pending.clear()
     
     print(f"Frame {frame_num:4d}/{total_frames-1} → {chunk_size:3d} bytes")
     frame_num += 1
     
-    time.sleep(FRAME_DELAY)
+    deadline += FRAME_DELAY
+    remaining = deadline - time.monotonic()
+    if remaining > 0:
+        time.sleep(remaining)
+    else:
+        # Fell behind (e.g. a blocked send); don't burst frames to catch up
+        deadline = time.monotonic()
 
 sock.close()
 print("\nMake sure to only press <ENTER> when the generated sound has ended\nor the audio will not be saved completely.")